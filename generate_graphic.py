@@ -3,7 +3,9 @@ import re
 from PIL import Image, ImageDraw, ImageFont
 from datetime import datetime
 from pathlib import Path
+from io import BytesIO
 import cairosvg
+from graphics_output import encode_png
 
 NEWS_FILE = "news/dubai-news.txt"
 LOGO_FILE = "logo.svg"
@@ -19,11 +21,12 @@ LINK_TEXT = "Telegram: @deutsche_in_dubai"
 LINK_FONT_SIZE = 25
 LINE_SPACING = 15  # Einheitlicher Zeilenabstand
 
-Path(OUTPUT_DIR).mkdir(exist_ok=True)
+def clear_output_dir():
+    Path(OUTPUT_DIR).mkdir(exist_ok=True)
 
-# Lösche alte Bilder aus dem Output-Ordner
-for file in Path(OUTPUT_DIR).glob("*.png"):
-    file.unlink()
+    # Lösche alte News-Grafiken; die Lifestyle-Posts im selben Ordner bleiben erhalten
+    for file in Path(OUTPUT_DIR).glob("news_*.png"):
+        file.unlink()
 
 def read_news_blocks():
     with open(NEWS_FILE, encoding="utf-8") as f:
@@ -67,7 +70,7 @@ def draw_wrapped_text(draw, text, font, start_y, max_width):
         y += draw.textbbox((0, 0), line, font=font)[3] + LINE_SPACING
     return y + LINE_SPACING
 
-def create_image(date_line, headline, summary_text, index):
+def create_image(date_line, headline, summary_text, index, output_dir=None):
     img = Image.new("RGB", (IMG_WIDTH, IMG_HEIGHT), BG_COLOR)
     draw = ImageDraw.Draw(img)
 
@@ -89,21 +92,19 @@ def create_image(date_line, headline, summary_text, index):
     draw.text((PADDING, link_y), LINK_TEXT, font=link_font, fill=TEXT_COLOR)
 
     # Logo
-    png_logo_path = os.path.join(OUTPUT_DIR, f"logo_tmp_{index}.png")
-    cairosvg.svg2png(url=LOGO_FILE, write_to=png_logo_path, output_width=220)
-    logo = Image.open(png_logo_path).convert("RGBA")
+    logo_png = cairosvg.svg2png(url=LOGO_FILE, output_width=220)
+    logo = Image.open(BytesIO(logo_png)).convert("RGBA")
     img.paste(logo, (IMG_WIDTH - logo.width - 40, IMG_HEIGHT - logo.height - 40), logo)
-    os.remove(png_logo_path)
 
-    output_path = os.path.join(OUTPUT_DIR, f"news_{index + 1}.png")
-    img.save(output_path)
-    print(f"✅ Grafik gespeichert: {output_path}")
+    output_path = os.path.join(output_dir, f"news_{index + 1}.png") if output_dir else None
+    return encode_png(img, output_path)
 
 def main():
+    clear_output_dir()
     print("📰 Lese Nachrichten aus Datei...")
     blocks = read_news_blocks()
     for i, (date_line, headline, summary) in enumerate(blocks):
-        create_image(date_line, headline, summary, i)
+        create_image(date_line, headline, summary, i, OUTPUT_DIR)
 
 if __name__ == "__main__":
     main()
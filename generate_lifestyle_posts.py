@@ -7,7 +7,17 @@ from datetime import datetime
 from pathlib import Path
 from io import BytesIO
 import cairosvg
+import logging
 from bs4 import BeautifulSoup
+from llm_client import chat_completion, log_latency_summary, LLMError
+from telegram_client import send_photos
+from graphics_output import encode_png, PUBLISH_GRAPHICS, SAVE_GRAPHICS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
 
 # OpenAI Client mit API-Key
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
@@ -65,14 +75,10 @@ def scrape_events():
         return random.choice(fallback_events)
 
 def generate_gpt_text(prompt):
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "Du bist ein Social-Media-Content-Creator für Dubai. Gib echte, abwechslungsreiche, sachlich richtige Inhalte in stilvollem Deutsch aus."},
-            {"role": "user", "content": prompt}
-        ]
-    )
-    return response.choices[0].message.content.strip()
+    return chat_completion([
+        {"role": "system", "content": "Du bist ein Social-Media-Content-Creator für Dubai. Gib echte, abwechslungsreiche, sachlich richtige Inhalte in stilvollem Deutsch aus."},
+        {"role": "user", "content": prompt}
+    ])
 
 def generate_dalle_image(prompt):
     response = client.images.generate(
@@ -116,15 +122,13 @@ def draw_text_block(draw, text, font, start_y, max_width, max_height):
         y += draw.textbbox((0, 0), l, font=font)[3] + LINE_SPACING
     return y
 
-def add_logo(image, index):
-    tmp_logo = f"logo_tmp_{index}.png"
-    cairosvg.svg2png(url=LOGO_FILE, write_to=tmp_logo, output_width=220)
-    logo = Image.open(tmp_logo).convert("RGBA")
+def add_logo(image):
+    logo_png = cairosvg.svg2png(url=LOGO_FILE, output_width=220)
+    logo = Image.open(BytesIO(logo_png)).convert("RGBA")
     image.paste(logo, (IMG_WIDTH - logo.width - 40, IMG_HEIGHT - logo.height - 40), logo)
-    os.remove(tmp_logo)
     return image
 
-def create_post_image(category, text, index):
+def create_post_image(category, text, index, output_dir=None):
     content = text.strip().replace("\"", "")
 
     dalle_prompt = content.split("\n")[0]
@@ -148,23 +152,34 @@ def create_post_image(category, text, index):
 
     draw.text((PADDING, IMG_HEIGHT - 80), "Telegram: @deutsche_in_dubai", font=link_font, fill=TEXT_COLOR)
 
-    bg_img = add_logo(bg_img, index)
+    bg_img = add_logo(bg_img)
 
-    output_path = os.path.join(OUTPUT_DIR, f"{index + 1}_{category}.png")
-    bg_img.save(output_path)
-    print(f"✅ Bild gespeichert: {output_path}")
+    output_path = os.path.join(output_dir, f"{index + 1}_{category}.png") if output_dir else None
+    return encode_png(bg_img, output_path)
 
 def main():
-    for i, (category, prompt) in enumerate(CATEGORIES):
-        print(f"\n--- Generiere {category} ---")
-
-        if category == "event":
-            event_title, event_description = scrape_events()
-            gpt_text = f"{event_title}\n{event_description}"
-        else:
-            gpt_text = generate_gpt_text(prompt)
+    photos = []
+    try:
+        for i, (category, prompt) in enumerate(CATEGORIES):
+            print(f"\n--- Generiere {category} ---")
 
-        create_post_image(category, gpt_text, i)
+            if category == "event":
+                event_title, event_description = scrape_events()
+                gpt_text = f"{event_title}\n{event_description}"
+            else:
+                try:
+                    gpt_text = generate_gpt_text(prompt)
+                except LLMError as e:
+                    logging.error(f"❌ {category} übersprungen: {e}")
+                    continue
+
+            buffer = create_post_image(category, gpt_text, i, OUTPUT_DIR if SAVE_GRAPHICS else None)
+            photos.append((buffer, gpt_text, f"{i + 1}_{category}.png"))
+
+        if PUBLISH_GRAPHICS:
+            send_photos(photos)
+    finally:
+        log_latency_summary()
 
 if __name__ == "__main__":
     main()
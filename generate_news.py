@@ -5,10 +5,9 @@ from html.parser import HTMLParser
 import re
 import os
 import logging
-from openai import OpenAI
-import requests
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+import telegram_client
+from llm_client import chat_completion, log_latency_summary, LLMError
+from graphics_output import PUBLISH_GRAPHICS, SAVE_GRAPHICS
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,8 +23,6 @@ RSS_FEEDS = [
 ]
 
 MAX_ARTICLES = 3
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 BREAKING_KEYWORDS = ["breaking"]
 
 class FigureRemovingParser(HTMLParser):
@@ -56,20 +53,12 @@ def strip_html(raw_html):
 
 def translate_text(text):
     logging.info(f"🔁 Übersetze: {text[:80]}...")
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "Du bist ein professioneller deutscher Nachrichtenredakteur. Übersetze präzise und stilistisch einwandfrei."},
-                {"role": "user", "content": text}
-            ]
-        )
-        result = response.choices[0].message.content.strip()
-        logging.info(f"✅ Übersetzt: {result[:80]}...")
-        return result
-    except Exception as e:
-        logging.error(f"❌ Fehler bei Übersetzung: {e}")
-        return text
+    result = chat_completion([
+        {"role": "system", "content": "Du bist ein professioneller deutscher Nachrichtenredakteur. Übersetze präzise und stilistisch einwandfrei."},
+        {"role": "user", "content": text}
+    ])
+    logging.info(f"✅ Übersetzt: {result[:80]}...")
+    return result
 
 def fetch_news():
     entries = []
@@ -91,25 +80,39 @@ def filter_breaking_news(news_items):
         if any(keyword in item.title.lower() for keyword in BREAKING_KEYWORDS)
     ]
 
-def format_news(news_items):
-    today = datetime.now(pytz.timezone("Asia/Dubai")).strftime("%d. %B %Y")
+def dubai_today():
+    return datetime.now(pytz.timezone("Asia/Dubai")).strftime("%d. %B %Y")
 
-    if not news_items:
-        return [f"Dubai-News – {today}\n\nKeine relevanten Dubai-News in den letzten 24 Stunden."]
+def format_news(news_items):
+    today = dubai_today()
 
-    blocks = []
-    for i, item in enumerate(news_items, start=1):
-        title = translate_text(item.title.strip())
+    articles = []
+    for item in news_items:
         link = item.link.strip()
         summary_raw = item.get("summary", "").strip()
         if not summary_raw and "content" in item and len(item["content"]) > 0:
             summary_raw = item["content"][0].get("value", "")
-        summary = translate_text(strip_html(summary_raw))
+        try:
+            title = translate_text(item.title.strip())
+            summary = translate_text(strip_html(summary_raw))
+        except LLMError as e:
+            # Lieber einen Artikel auslassen als unübersetzten Text veröffentlichen
+            logging.error(f"❌ Übersetzung fehlgeschlagen, Artikel übersprungen: {e}")
+            continue
         prefix = "🚨 BREAKING: " if any(keyword in title.lower() for keyword in BREAKING_KEYWORDS) else ""
-        block = f"Dubai-News – {today}\n\n{prefix}{title}\n{summary}\n{link}"
-        blocks.append(block)
+        articles.append((today, f"{prefix}{title}", summary, link))
 
-    return blocks
+    return articles
+
+def format_block(today, title, summary, link):
+    return f"Dubai-News – {today}\n\n{title}\n{summary}\n{link}"
+
+def format_caption(today, title, summary, link):
+    # Titel und Link bleiben vollständig, nur die Zusammenfassung wird auf das Telegram-Limit gekürzt
+    return telegram_client.fit_caption(f"Dubai-News – {today}\n\n{title}\n", summary, f"\n{link}")
+
+def no_news_block():
+    return f"Dubai-News – {dubai_today()}\n\nKeine relevanten Dubai-News in den letzten 24 Stunden."
 
 def write_to_file(blocks):
     with open("news/dubai-news.txt", "w", encoding="utf-8") as f:
@@ -119,22 +122,42 @@ def write_to_file(blocks):
         f.write(f"Generated at: {datetime.now().isoformat()}\n")
 
 def send_to_telegram(blocks):
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        logging.warning("⚠️ Telegram-Token oder Chat-ID fehlen")
+    if not telegram_client.is_configured():
         return
 
     for block in blocks:
+        telegram_client.send_message(block)
+
+def publish_graphics(articles):
+    # Erst hier importieren, damit der reine Text-Modus ohne Pillow/CairoSVG auskommt
+    try:
+        import generate_graphic
+    except ImportError as e:
+        logging.error(f"❌ Grafik-Modul nicht verfügbar, sende Artikel als Text: {e}")
+        send_to_telegram([format_block(*article) for article in articles])
+        return
+
+    output_dir = None
+    if SAVE_GRAPHICS:
+        generate_graphic.clear_output_dir()
+        output_dir = generate_graphic.OUTPUT_DIR
+
+    publish = telegram_client.is_configured()
+
+    # Pro Artikel rendern und senden: ein Fehler betrifft nur diesen Artikel, der dann als Text rausgeht
+    for i, article in enumerate(articles):
+        today, title, summary, link = article
         try:
-            response = requests.post(
-                f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage",
-                data={"chat_id": TELEGRAM_CHAT_ID, "text": block}
-            )
-            if response.status_code == 200:
-                logging.info("📤 Gesendet an Telegram")
-            else:
-                logging.error(f"❌ Fehler beim Senden an Telegram: {response.text}")
+            buffer = generate_graphic.create_image(today, title, summary, i, output_dir)
         except Exception as e:
-            logging.error(f"❌ Ausnahme bei Telegram-Sendung: {e}")
+            logging.error(f"❌ Grafik für Artikel {i + 1} fehlgeschlagen: {e}")
+            buffer = None
+
+        if not publish:
+            continue
+        if buffer is None or not telegram_client.send_photo(buffer, caption=format_caption(*article), filename=f"news_{i + 1}.png"):
+            logging.warning("⚠️ Kein Bild gesendet, sende Artikel als Text")
+            telegram_client.send_message(format_block(*article))
 
 def main():
     logging.info("🚀 Starte News-Aktualisierung")
@@ -146,9 +169,18 @@ def main():
             logging.info("ℹ️ Keine neuen Breaking News gefunden.")
             return
 
-    blocks = format_news(news)
+    articles = format_news(news)
+    log_latency_summary()
+    if news and not articles:
+        logging.error("❌ Keine Artikel übersetzt, Datei und Telegram bleiben unverändert.")
+        return
+
+    blocks = [format_block(*article) for article in articles] or [no_news_block()]
     write_to_file(blocks)
-    send_to_telegram(blocks)
+    if PUBLISH_GRAPHICS and articles:
+        publish_graphics(articles)
+    else:
+        send_to_telegram(blocks)
     logging.info("✅ Datei aktualisiert und Telegram-Benachrichtigung gesendet.")
 
 if __name__ == "__main__":
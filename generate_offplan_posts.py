@@ -6,6 +6,16 @@ from pathlib import Path
 import requests
 from io import BytesIO
 import cairosvg
+import logging
+from llm_client import chat_completion, log_latency_summary, LLMError
+from telegram_client import send_photos
+from graphics_output import encode_png, PUBLISH_GRAPHICS, SAVE_GRAPHICS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
 
 # OpenAI Client
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
@@ -36,20 +46,16 @@ OUTPUT_DIR = "graphics_offplan"
 Path(OUTPUT_DIR).mkdir(exist_ok=True)
 
 def generate_gpt_text(prompt):
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": (
-                "Du bist Immobilien-Content-Creator für Dubai. "
-                "Gib ein echtes aktuelles Off-Plan Projekt wieder: "
-                "Zuerst nur der Projektnamen (ohne Zusatz), dann ein Zeilenumbruch, dann eine stilvolle Kurzbeschreibung (max. 2 Sätze) "
-                "auf Deutsch, inklusive geplanter Fertigstellung falls verfügbar. "
-                "Keine Listen, keine Stichpunkte, keine Einleitungen oder weiteren Kommentare."
-            )},
-            {"role": "user", "content": prompt}
-        ]
-    )
-    return response.choices[0].message.content.strip()
+    return chat_completion([
+        {"role": "system", "content": (
+            "Du bist Immobilien-Content-Creator für Dubai. "
+            "Gib ein echtes aktuelles Off-Plan Projekt wieder: "
+            "Zuerst nur der Projektnamen (ohne Zusatz), dann ein Zeilenumbruch, dann eine stilvolle Kurzbeschreibung (max. 2 Sätze) "
+            "auf Deutsch, inklusive geplanter Fertigstellung falls verfügbar. "
+            "Keine Listen, keine Stichpunkte, keine Einleitungen oder weiteren Kommentare."
+        )},
+        {"role": "user", "content": prompt}
+    ])
 
 def generate_dalle_image(prompt):
     response = client.images.generate(
@@ -97,15 +103,13 @@ def draw_wrapped_text(draw, text, font, start_y, max_width, max_height):
         y += text_height + line_spacing
     return y
 
-def add_logo(image, index):
-    tmp_logo = f"logo_tmp_{index}.png"
-    cairosvg.svg2png(url=LOGO_FILE, write_to=tmp_logo, output_width=220)
-    logo = Image.open(tmp_logo).convert("RGBA")
+def add_logo(image):
+    logo_png = cairosvg.svg2png(url=LOGO_FILE, output_width=220)
+    logo = Image.open(BytesIO(logo_png)).convert("RGBA")
     image.paste(logo, (IMG_WIDTH - logo.width - 40, IMG_HEIGHT - logo.height - 40), logo)
-    os.remove(tmp_logo)
     return image
 
-def create_post_image(category, text, index):
+def create_post_image(category, text, index, output_dir=None):
     content = text.strip().replace("\"", "")
     dalle_prompt = content.split("\n")[0]  # Nur der Projekttitel für DALL-E!
 
@@ -145,17 +149,28 @@ def create_post_image(category, text, index):
     # Telegram-Link unten
     draw.text((PADDING, IMG_HEIGHT - 80), "Telegram: @deutsche_in_dubai", font=link_font, fill=TEXT_COLOR)
 
-    bg_img = add_logo(bg_img, index)
+    bg_img = add_logo(bg_img)
 
-    output_path = os.path.join(OUTPUT_DIR, f"{index + 1}_{category}.png")
-    bg_img.save(output_path)
-    print(f"✅ Bild gespeichert: {output_path}")
+    output_path = os.path.join(output_dir, f"{index + 1}_{category}.png") if output_dir else None
+    return encode_png(bg_img, output_path)
 
 def main():
-    for i, (category, prompt) in enumerate(CATEGORIES):
-        print(f"\n--- Generiere {category} ---")
-        gpt_text = generate_gpt_text(prompt)
-        create_post_image(category, gpt_text, i)
+    photos = []
+    try:
+        for i, (category, prompt) in enumerate(CATEGORIES):
+            print(f"\n--- Generiere {category} ---")
+            try:
+                gpt_text = generate_gpt_text(prompt)
+            except LLMError as e:
+                logging.error(f"❌ {category} übersprungen: {e}")
+                continue
+            buffer = create_post_image(category, gpt_text, i, OUTPUT_DIR if SAVE_GRAPHICS else None)
+            photos.append((buffer, gpt_text, f"{i + 1}_{category}.png"))
+
+        if PUBLISH_GRAPHICS:
+            send_photos(photos)
+    finally:
+        log_latency_summary()
 
 if __name__ == "__main__":
     main()
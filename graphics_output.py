@@ -0,0 +1,18 @@
+import os
+from io import BytesIO
+from pathlib import Path
+
+PUBLISH_GRAPHICS = os.getenv("PUBLISH_GRAPHICS") == "true"  # Grafiken direkt aus dem Speicher an Telegram senden
+SAVE_GRAPHICS = os.getenv("SAVE_GRAPHICS", "true") == "true"  # PNGs zusätzlich auf der Festplatte ablegen
+
+
+def encode_png(img, output_path=None):
+    # PNG einmal im Speicher kodieren; Festplatte nur, wenn ein Pfad angegeben ist
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    buffer.seek(0)
+
+    if output_path:
+        Path(output_path).write_bytes(buffer.getvalue())
+        print(f"✅ Grafik gespeichert: {output_path}")
+    return buffer
@@ -0,0 +1,233 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from openai import OpenAI, APITimeoutError
+
+# Gemeinsame GPT-Aufrufschicht: Deadline pro Aufruf, Hedging, Fallback-Modell und Run-Budget.
+# Retries übernimmt diese Schicht selbst (Hedge/Fallback), daher max_retries=0 im Client.
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+PRIMARY_MODEL = os.getenv("LLM_MODEL", "gpt-4")
+FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL", "gpt-4o-mini")
+
+CALL_DEADLINE = float(os.getenv("LLM_DEADLINE", "30"))  # Sekunden pro Aufruf inkl. Hedge und Fallback
+FALLBACK_AT = float(os.getenv("LLM_FALLBACK_AT", "0.6"))  # Anteil der Deadline, ab dem das Fallback-Modell startet
+HEDGE_ENABLED = os.getenv("LLM_HEDGE", "true") == "true"
+HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "12"))  # Startwert, bis genug Messwerte für ein p95 vorliegen
+HEDGE_MIN_SAMPLES = 5
+
+MAX_TOKENS_PER_RUN = int(os.getenv("LLM_MAX_TOKENS_PER_RUN", "50000"))
+MAX_COST_PER_RUN = float(os.getenv("LLM_MAX_COST_PER_RUN", "1.0"))  # USD
+RESERVED_COMPLETION_TOKENS = int(os.getenv("LLM_RESERVED_COMPLETION_TOKENS", "800"))  # Schätzung pro laufender Anfrage
+
+# USD pro 1000 Tokens (Prompt, Completion); unbekannte Modelle werden wie gpt-4 berechnet
+PRICES = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+}
+
+# Verlierer eines Hedge-/Fallback-Rennens werden nicht abgebrochen, da sich laufende HTTP-Anfragen
+# nicht abbrechen lassen. Sie laufen bis zu ihrer Deadline weiter (und verzögern das Prozessende
+# höchstens so lange), bleiben bis dahin im Budget reserviert und werden danach normal verbucht.
+_executor = ThreadPoolExecutor(max_workers=8)
+_lock = threading.Lock()
+_latencies = {}
+_failed_latencies = {}  # Laufzeit fehlgeschlagener Anfragen, nur untere Schranke (zensiert) und nicht im p95
+_usage = {"tokens": 0, "cost": 0.0, "estimated_cost": 0.0}
+_reserved = {"tokens": 0, "cost": 0.0}
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMBudgetExceeded(LLMError):
+    pass
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, int(round(p / 100 * len(ordered))) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def _cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = PRICES.get(model, PRICES["gpt-4"])
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def _hedge_delay(model):
+    # Nur erfolgreiche Anfragen: ein Timeout läge bei der Deadline und würde das Hedging abschalten
+    with _lock:
+        samples = list(_latencies.get(model, []))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_AFTER
+    return percentile(samples, 95)
+
+
+def _record_success(model, latency, usage):
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    with _lock:
+        _latencies.setdefault(model, []).append(latency)
+        _usage["tokens"] += prompt_tokens + completion_tokens
+        _usage["cost"] += _cost(model, prompt_tokens, completion_tokens)
+
+
+def _record_failure(model, latency, billed=None):
+    # billed: reservierte Schätzung (Tokens, Kosten) für abgebrochene Anfragen, die OpenAI trotzdem berechnen kann
+    with _lock:
+        _failed_latencies.setdefault(model, []).append(latency)
+        if billed:
+            tokens, cost = billed
+            _usage["tokens"] += tokens
+            _usage["cost"] += cost
+            _usage["estimated_cost"] += cost
+
+
+def _estimate(model, messages):
+    # Grobe Schätzung (ca. 3 Zeichen pro Token) für die Reservierung laufender Anfragen
+    prompt_tokens = sum(len(m["content"]) // 3 + 4 for m in messages)
+    tokens = prompt_tokens + RESERVED_COMPLETION_TOKENS
+    return tokens, _cost(model, prompt_tokens, RESERVED_COMPLETION_TOKENS)
+
+
+def _reserve(tokens, cost):
+    with _lock:
+        spent_tokens = _usage["tokens"] + _reserved["tokens"]
+        spent_cost = _usage["cost"] + _reserved["cost"]
+        if spent_tokens + tokens > MAX_TOKENS_PER_RUN or spent_cost + cost > MAX_COST_PER_RUN:
+            raise LLMBudgetExceeded(
+                f"Budget erschöpft: {spent_tokens} Tokens, {spent_cost:.2f} USD (inkl. laufender Anfragen)"
+            )
+        _reserved["tokens"] += tokens
+        _reserved["cost"] += cost
+
+
+def _release(tokens, cost):
+    with _lock:
+        _reserved["tokens"] -= tokens
+        _reserved["cost"] -= cost
+
+
+def _call(model, messages, timeout, reservation):
+    started = time.monotonic()
+    try:
+        response = client.with_options(timeout=timeout).chat.completions.create(
+            model=model,
+            messages=messages
+        )
+    except Exception as e:
+        _record_failure(model, time.monotonic() - started, reservation if isinstance(e, APITimeoutError) else None)
+        raise
+    else:
+        _record_success(model, time.monotonic() - started, response.usage)
+    finally:
+        _release(*reservation)
+    return response.choices[0].message.content.strip()
+
+
+def _submit(model, messages, end):
+    reservation = _estimate(model, messages)
+    _reserve(*reservation)
+    try:
+        return _executor.submit(_call, model, messages, max(end - time.monotonic(), 0.1), reservation)
+    except Exception:
+        _release(*reservation)
+        raise
+
+
+def chat_completion(messages, model=None, fallback_model=None, deadline=None):
+    model = model or PRIMARY_MODEL
+    fallback_model = fallback_model or FALLBACK_MODEL
+    deadline = deadline or CALL_DEADLINE
+
+    start = time.monotonic()
+    end = start + deadline
+    hedge_at = start + _hedge_delay(model) if HEDGE_ENABLED else None
+    fallback_at = start + deadline * FALLBACK_AT if fallback_model != model else None
+
+    pending = {_submit(model, messages, end)}
+    last_error = None
+
+    while True:
+        now = time.monotonic()
+
+        # Zweite Anfrage an dasselbe Modell, wenn die erste länger als p95 braucht
+        if hedge_at is not None and now >= hedge_at:
+            hedge_at = None
+            if pending:
+                try:
+                    pending.add(_submit(model, messages, end))
+                    logging.info(f"⏱️ Hedge-Anfrage an {model} nach {now - start:.1f}s")
+                except LLMBudgetExceeded as e:
+                    logging.warning(f"⚠️ Kein Hedge möglich: {e}")
+
+        # Schnelleres Modell, wenn die Deadline gefährdet ist oder alle Anfragen fehlgeschlagen sind
+        if fallback_at is not None and (now >= fallback_at or not pending):
+            fallback_at = None
+            try:
+                pending.add(_submit(fallback_model, messages, end))
+                logging.info(f"↪️ Fallback auf {fallback_model} nach {now - start:.1f}s")
+            except LLMBudgetExceeded as e:
+                logging.warning(f"⚠️ Kein Fallback möglich: {e}")
+
+        if not pending or now >= end:
+            break
+
+        wake_at = min(t for t in (hedge_at, fallback_at, end) if t is not None)
+        done, pending = wait(pending, timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                return future.result()
+            except Exception as e:
+                last_error = e
+                logging.warning(f"⚠️ GPT-Anfrage fehlgeschlagen: {e}")
+
+    if last_error and not pending:
+        raise LLMError(f"Alle GPT-Anfragen fehlgeschlagen: {last_error}") from last_error
+    raise LLMError(f"Keine GPT-Antwort innerhalb von {deadline:.0f}s")
+
+
+def latency_summary():
+    # Perzentile nur über erfolgreiche Anfragen; Fehlschläge sind zensiert (nur "mindestens so lange")
+    with _lock:
+        summary = {}
+        for model in set(_latencies) | set(_failed_latencies):
+            ok = _latencies.get(model, [])
+            failed = _failed_latencies.get(model, [])
+            summary[model] = {
+                "count": len(ok),
+                "failures": len(failed),
+                "p50": percentile(ok, 50),
+                "p95": percentile(ok, 95),
+                "max": max(ok, default=None),
+                "failed_max": max(failed, default=None),
+            }
+        usage = dict(_usage)
+        usage["reserved_cost"] = _reserved["cost"]
+    return summary, usage
+
+
+def log_latency_summary():
+    summary, usage = latency_summary()
+
+    def fmt(value):
+        return "-" if value is None else f"{value:.1f}s"
+
+    for model, stats in sorted(summary.items()):
+        logging.info(
+            f"📊 {model}: {stats['count']} ok, p50 {fmt(stats['p50'])}, p95 {fmt(stats['p95'])}, "
+            f"max {fmt(stats['max'])}; {stats['failures']} Fehler/Timeouts (abgebrochen nach bis zu "
+            f"{fmt(stats['failed_max'])})"
+        )
+    logging.info(
+        f"💰 GPT-Verbrauch: {usage['tokens']} Tokens, {usage['cost']:.3f} USD "
+        f"(davon geschätzt für Timeouts: {usage['estimated_cost']:.3f} USD, "
+        f"noch reserviert für laufende Anfragen: {usage['reserved_cost']:.3f} USD)"
+    )
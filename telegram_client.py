@@ -0,0 +1,92 @@
+import os
+import json
+import logging
+import requests
+
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_API_URL = "https://api.telegram.org/bot{token}/{method}"
+
+CAPTION_LIMIT = 1024  # Telegram-Limit für Bildunterschriften
+MEDIA_GROUP_LIMIT = 10  # Maximal 10 Bilder pro Album
+
+
+def is_configured():
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
+        logging.warning("⚠️ Telegram-Token oder Chat-ID fehlen")
+        return False
+    return True
+
+
+def caption_length(text):
+    # Telegram zählt UTF-16-Einheiten, Emojis zählen doppelt
+    return len(text.encode("utf-16-le")) // 2
+
+
+def fit_caption(head, body, tail=""):
+    # head und tail (z.B. Titel und Link) bleiben vollständig, nur body wird gekürzt
+    room = CAPTION_LIMIT - caption_length(head + tail)
+    if caption_length(body) <= room:
+        return head + body + tail
+    body = body[:max(room, 0)]
+    while body and caption_length(body.rstrip()) + 1 > room:
+        body = body[:-1]
+    return head + body.rstrip() + "…" + tail
+
+
+def truncate_caption(caption):
+    return fit_caption("", caption)
+
+
+def _post(method, data, files=None):
+    try:
+        response = requests.post(
+            TELEGRAM_API_URL.format(token=TELEGRAM_BOT_TOKEN, method=method),
+            data={"chat_id": TELEGRAM_CHAT_ID, **data},
+            files=files,
+            timeout=60
+        )
+        if response.status_code == 200:
+            logging.info(f"📤 {method}: an Telegram gesendet")
+            return True
+        logging.error(f"❌ Fehler bei {method}: {response.text}")
+    except Exception as e:
+        logging.error(f"❌ Ausnahme bei {method}: {e}")
+    return False
+
+
+def send_message(text, parse_mode=None):
+    data = {"text": text}
+    if parse_mode:
+        data["parse_mode"] = parse_mode
+    return _post("sendMessage", data)
+
+
+def send_photo(buffer, caption="", filename="image.png"):
+    # Bild direkt aus dem Speicher als Multipart-Upload senden
+    buffer.seek(0)
+    return _post(
+        "sendPhoto",
+        {"caption": truncate_caption(caption)},
+        {"photo": (filename, buffer, "image/png")}
+    )
+
+
+def send_media_group(photos):
+    # photos: Liste von (buffer, caption, filename); Einzelbilder gehen über sendPhoto
+    if len(photos) == 1:
+        return send_photo(*photos[0])
+
+    media, files = [], {}
+    for i, (buffer, caption, filename) in enumerate(photos):
+        buffer.seek(0)
+        files[f"photo{i}"] = (filename, buffer, "image/png")
+        media.append({"type": "photo", "media": f"attach://photo{i}", "caption": truncate_caption(caption)})
+    return _post("sendMediaGroup", {"media": json.dumps(media)}, files)
+
+
+def send_photos(photos):
+    if not photos or not is_configured():
+        return
+    for start in range(0, len(photos), MEDIA_GROUP_LIMIT):
+        send_media_group(photos[start:start + MEDIA_GROUP_LIMIT])